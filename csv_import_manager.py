@@ -1,147 +1,228 @@
 import streamlit as st
 import pandas as pd
-import json
+import numpy as np
+import functools
+import io
 import os
 import logging
+import logging.handlers
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from types import MappingProxyType
+from typing import Dict, Any, List, Optional, Tuple
 
-# Configure logging
+from json_storage import PRETTY_JSON, load_json, save_json
+from payment_core import MONTH_STRINGS
+
+# pyarrow is installed with streamlit, the pandas CSV parser is used without it
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pacsv
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# Configure logging, file writes are buffered and flushed on errors or when the buffer is full
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+_log_file_handler = logging.FileHandler('csv_import.log')
+_log_file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
+    format=LOG_FORMAT,
     handlers=[
-        logging.FileHandler('csv_import.log'),
+        logging.handlers.MemoryHandler(capacity=1000, flushLevel=logging.ERROR, target=_log_file_handler),
         logging.StreamHandler()
     ]
 )
 logger = logging.getLogger(__name__)
 
+# Constants
+# German month names indexed by month number (index 0 is the empty choice)
+MONTH_NAMES = (
+    "", "Januar", "Februar", "März", "April", "Mai", "Juni",
+    "Juli", "August", "September", "Oktober", "November", "Dezember"
+)
+PAYMENT_PURPOSES = ("Mitgliederbeitrag", "Einführungskurs")
+MONTH_TO_NUM = MappingProxyType({name: MONTH_STRINGS[num - 1] for num, name in enumerate(MONTH_NAMES) if name})
+_MONTH_NAME_ARRAY = np.array(MONTH_NAMES)
+
+def _file_mtime_ns(path: str) -> int:
+    """Modification time of a file in nanoseconds, 0 if it does not exist"""
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return 0
+
+def _clean_text(series: pd.Series) -> pd.Series:
+    """Convert a column to stripped strings, missing values become empty strings"""
+    return series.astype(object).fillna('').astype(str).str.strip()
+
+@functools.lru_cache(maxsize=1)
+def _build_column_config(member_names: tuple) -> Dict[str, Any]:
+    """Build the column configuration of the CSV import table"""
+    column_config = {
+        "Datum": st.column_config.DateColumn(
+            "Datum", 
+            format="DD.MM.YYYY",
+            disabled=True
+        ),
+        "Details": st.column_config.TextColumn(
+            "Details",
+            disabled=True
+        ),
+        "Amount": st.column_config.NumberColumn(
+            "Betrag (CHF)",
+            format="%.2f",
+            disabled=True
+        ),
+        "Zahlungszweck": st.column_config.SelectboxColumn(
+            "Zahlungszweck",
+            options=list(PAYMENT_PURPOSES),
+            required=True
+        ),
+        "Mitglied": st.column_config.SelectboxColumn(
+            "Mitglied",
+            options=[""] + list(member_names),
+            required=True
+        ),
+        "Monat": st.column_config.SelectboxColumn(
+            "Monat",
+            options=list(MONTH_NAMES),
+            required=True
+        ),
+        "Bemerkungen": st.column_config.TextColumn(
+            "Bemerkungen",
+            disabled=True
+        ),
+        "ZKB-Referenz": st.column_config.TextColumn(
+            "ZKB-Referenz",
+            disabled=True
+        )
+    }
+    
+    return column_config
+
 class CSVImportManager:
     def __init__(self):
         self.member_db_file = "k-lab_member_database.json"
         self.categories_file = "categories.json"
         self.imported_data = None
         self.processed_data = None
+        # Parsed JSON files keyed on file mtime: (mtime_ns, data)
+        self._member_db_cache = None
+        self._mappings_cache = None
         
     def load_member_database(self) -> Dict[str, Any]:
-        """Load member database from JSON file"""
-        logger.info("Loading member database for CSV import")
+        """Load member database from JSON file (cached until the file changes)"""
         try:
             if os.path.exists(self.member_db_file):
-                with open(self.member_db_file, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                    logger.info(f"Successfully loaded {len(data.get('members', {}))} members")
-                    return data
+                mtime = os.stat(self.member_db_file).st_mtime_ns
+                if self._member_db_cache is not None and self._member_db_cache[0] == mtime:
+                    return self._member_db_cache[1]
+                
+                logger.info("Loading member database for CSV import")
+                data = load_json(self.member_db_file)
+                logger.info("Successfully loaded %d members", len(data.get('members', {})))
+                self._member_db_cache = (mtime, data)
+                return data
             else:
                 logger.warning("Member database file not found")
                 return {"members": {}}
         except Exception as e:
-            logger.error(f"Error loading member database: {str(e)}")
+            logger.error("Error loading member database: %s", e)
             st.error(f"Fehler beim Laden der Mitgliederdatenbank: {str(e)}")
             return {"members": {}}
     
-    def get_member_names(self) -> List[str]:
-        """Get list of all member names for dropdown"""
-        member_db = self.load_member_database()
-        return [member_data["name"] for member_data in member_db.get("members", {}).values()]
+    def get_member_names(self) -> Tuple[str, ...]:
+        """Get sorted member names for dropdown (cached until the database file changes)"""
+        return self._member_names_cached(self.member_db_file, _file_mtime_ns(self.member_db_file))
+    
+    @st.cache_data(show_spinner=False)
+    def _member_names_cached(_self, member_db_file: str, member_db_mtime: int) -> Tuple[str, ...]:
+        """Sorted member names, cached across reruns on the database path and mtime"""
+        member_db = _self.load_member_database()
+        return tuple(sorted(member_data["name"] for member_data in member_db.get("members", {}).values()))
     
     def _add_smart_month_defaults(self, df: pd.DataFrame) -> pd.DataFrame:
         """Add smart month defaults based on payment date"""
         logger.info("Adding smart month defaults")
         
-        # Month names mapping
-        month_names = {
-            1: "Januar", 2: "Februar", 3: "März", 4: "April",
-            5: "Mai", 6: "Juni", 7: "Juli", 8: "August",
-            9: "September", 10: "Oktober", 11: "November", 12: "Dezember"
-        }
-        
-        for idx, row in df.iterrows():
-            payment_date = row['Datum']
-            if pd.isna(payment_date):
-                continue
-                
-            # Check if payment is within first 7 days of the month
-            day_of_month = payment_date.day
-            
-            if day_of_month <= 7:
-                # No default for payments within first 7 days
-                df.at[idx, 'Monat'] = ''
-            else:
-                # Set default to current month
-                month_name = month_names[payment_date.month]
-                df.at[idx, 'Monat'] = month_name
+        # Only payments after the first 7 days of the month get a default,
+        # missing dates and early payments are left empty
+        dates = df['Datum']
+        mask = (dates.dt.day.to_numpy() > 7) & dates.notna().to_numpy()
+        month_idx = np.where(mask, dates.dt.month.fillna(0).to_numpy(dtype=int), 0)
+        df['Monat'] = np.where(mask, _MONTH_NAME_ARRAY[month_idx], '')
         
         logger.info("Smart month defaults added")
         return df
     
+    @st.cache_resource(show_spinner=False)
+    def _member_lookup(_self, member_db_file: str, mtime_ns: int) -> tuple[Dict[str, str], set]:
+        """Build name -> member ID and existing (member ID, month) lookups, cached per database file version"""
+        members = _self.load_member_database().get("members", {})
+        
+        name_to_id = {}
+        for mid, member_data in members.items():
+            name_to_id.setdefault(member_data["name"], mid)
+        existing = {
+            (mid, month_num)
+            for mid, member_data in members.items()
+            for month_num in member_data.get("contributions", {}).get("2025", {})
+        }
+        return name_to_id, existing
+    
     def _check_existing_entries(self, df: pd.DataFrame) -> List[str]:
         """Check if entries already exist in the member database"""
         logger.info("Checking for existing entries in database")
         
-        member_db = self.load_member_database()
-        conflicts = []
+        name_to_id, existing = self._member_lookup(self.member_db_file, _file_mtime_ns(self.member_db_file))
         
-        # Month name to number mapping
-        month_to_num = {
-            "Januar": "01", "Februar": "02", "März": "03", "April": "04",
-            "Mai": "05", "Juni": "06", "Juli": "07", "August": "08",
-            "September": "09", "Oktober": "10", "November": "11", "Dezember": "12"
-        }
+        member_names = _clean_text(df['Mitglied'])
+        month_names = _clean_text(df['Monat'])
+        purposes = _clean_text(df['Zahlungszweck'])
         
-        for idx, row in df.iterrows():
-            member_name = str(row['Mitglied']).strip()
-            month_name = str(row['Monat']).strip()
-            purpose = str(row['Zahlungszweck']).strip()
-            
-            # Find member ID
-            member_id = None
-            for mid, member_data in member_db.get("members", {}).items():
-                if member_data["name"] == member_name:
-                    member_id = mid
-                    break
-            
-            if member_id is None:
-                continue
-            
-            # Check if entry already exists
-            month_num = month_to_num.get(month_name)
-            if month_num:
-                contributions = member_db["members"][member_id].get("contributions", {}).get("2025", {})
-                if month_num in contributions:
-                    existing_entry = contributions[month_num]
-                    conflicts.append(f"{member_name} - {month_name} ({purpose})")
-        
-        logger.info(f"Found {len(conflicts)} existing conflicts")
+        member_ids = member_names.map(name_to_id)
+        month_nums = month_names.map(MONTH_TO_NUM)
+        mask = [key in existing for key in zip(member_ids, month_nums)]
+        
+        conflicts = (
+            member_names[mask] + " - " + month_names[mask] + " (" + purposes[mask] + ")"
+        ).tolist()
+        
+        logger.info("Found %d existing conflicts", len(conflicts))
         return conflicts
     
     def load_member_mappings(self) -> Dict[str, str]:
-        """Load member mappings from JSON file (Details -> Member Name)"""
-        logger.info("Loading member mappings for auto-assignment")
+        """Load member mappings from JSON file (Details -> Member Name), cached until the file changes"""
         try:
             if os.path.exists(self.categories_file):
-                with open(self.categories_file, "r", encoding="utf-8") as f:
-                    mappings = json.load(f)
-                    logger.info(f"Successfully loaded {len(mappings)} member mappings")
-                    return mappings
+                mtime = os.stat(self.categories_file).st_mtime_ns
+                if self._mappings_cache is not None and self._mappings_cache[0] == mtime:
+                    return self._mappings_cache[1]
+                
+                logger.info("Loading member mappings for auto-assignment")
+                mappings = load_json(self.categories_file)
+                logger.info("Successfully loaded %d member mappings", len(mappings))
+                self._mappings_cache = (mtime, mappings)
+                return mappings
             else:
                 logger.warning("Member mappings file not found, creating empty structure")
                 return {}
         except Exception as e:
-            logger.error(f"Error loading member mappings: {str(e)}")
+            logger.error("Error loading member mappings: %s", e)
             return {}
     
     def save_member_mappings(self, mappings: Dict[str, str]) -> bool:
         """Save member mappings to JSON file"""
         logger.info("Saving member mappings to file")
+        self._mappings_cache = None
         try:
-            with open(self.categories_file, "w", encoding="utf-8") as f:
-                json.dump(mappings, f, ensure_ascii=False, indent=2)
+            save_json(self.categories_file, mappings)
             logger.info("Successfully saved member mappings")
             return True
         except Exception as e:
-            logger.error(f"Error saving member mappings: {str(e)}")
+            logger.error("Error saving member mappings: %s", e)
             return False
     
     def auto_assign_members(self, df: pd.DataFrame) -> pd.DataFrame:
@@ -150,77 +231,112 @@ class CSVImportManager:
         
         mappings = self.load_member_mappings()
         
-        for idx, row in df.iterrows():
-            details = str(row['Details']).lower().strip()
-            current_member = row['Mitglied']
-            
-            # Skip if already assigned
-            if current_member and current_member != '':
-                continue
+        details = _clean_text(df['Details']).str.lower()
+        
+        # Only rows without a member are assigned
+        unassigned = df['Mitglied'].isna() | df['Mitglied'].eq('')
+        
+        # Check details against each known mapping, first matching mapping wins
+        for details_key, member_name in mappings.items():
+            if not unassigned.any():
+                break
             
-            # Check if details matches any known mapping
-            for details_key, member_name in mappings.items():
-                if details_key.lower() in details:
-                    df.at[idx, 'Mitglied'] = member_name
-                    logger.info(f"Auto-assigned member: '{details}' -> '{member_name}'")
-                    break
+            matches = unassigned & details.str.contains(details_key.lower(), regex=False)
+            if matches.any():
+                df.loc[matches, 'Mitglied'] = member_name
+                unassigned &= ~matches
+                logger.debug("Auto-assigned %d transactions: '%s' -> '%s'", matches.sum(), details_key, member_name)
         
         logger.info("Auto-assignment completed")
         return df
     
-    def add_member_mapping(self, details: str, member_name: str) -> bool:
-        """Add a member mapping for future auto-assignment"""
-        logger.info(f"Adding member mapping: '{details}' -> '{member_name}'")
-        
-        mappings = self.load_member_mappings()
-        
-        details_key = details.strip()
-        if details_key and details_key not in mappings:
-            mappings[details_key] = member_name
-            if self.save_member_mappings(mappings):
-                logger.info(f"Successfully added mapping: '{details_key}' -> '{member_name}'")
-                return True
-            else:
-                logger.error("Failed to save member mappings")
-                return False
-        
-        return False
+    def _to_category(self, series: pd.Series, options) -> pd.Series:
+        """Convert a dropdown column to a categorical with the dropdown options as categories"""
+        # Keep values that are not part of the options (e.g. auto-assigned names
+        # missing in the database) instead of turning them into NaN
+        categories = list(dict.fromkeys([*options, *series.dropna().unique()]))
+        return series.astype(pd.CategoricalDtype(categories))
+    
+    @st.cache_data(show_spinner=False)
+    def _parse_csv_bytes(_self, data: bytes, name: str, member_db_mtime: int, mappings_mtime: int) -> Optional[pd.DataFrame]:
+        """Parse uploaded CSV content, cached on the file content and the database/mappings versions"""
+        logger.info("Parsing uploaded CSV file %s", name)
+        return _self.parse_csv_file(io.BytesIO(data))
+    
+    def _read_credit_transactions(self, uploaded_file) -> pd.DataFrame:
+        """Read the bank statement CSV and return the credit rows with parsed 'Amount' and 'Date' columns"""
+        if PYARROW_AVAILABLE:
+            try:
+                # Parse with the pyarrow CSV reader, amount and date are typed while
+                # parsing and rows without a credit amount are dropped before
+                # converting to pandas
+                table = pacsv.read_csv(
+                    uploaded_file,
+                    parse_options=pacsv.ParseOptions(delimiter=';'),
+                    convert_options=pacsv.ConvertOptions(
+                        column_types={'Gutschrift CHF': pa.float64(), 'Datum': pa.timestamp('ns')},
+                        timestamp_parsers=['%d.%m.%Y']
+                    )
+                )
+                logger.info("CSV loaded with %d rows and columns: %s", table.num_rows, table.column_names)
+                
+                # Clean column names
+                table = table.rename_columns([col.strip().replace('"', '') for col in table.column_names])
+                
+                # Carry the row positions through the filter, so the index matches
+                # the rows of the statement like on the pandas path
+                row_positions = np.flatnonzero(pc.is_valid(table['Gutschrift CHF']).to_numpy(zero_copy_only=False))
+                table = table.take(pa.array(row_positions))
+                
+                credit_df = table.to_pandas()
+                credit_df.index = pd.Index(row_positions)
+                credit_df['Amount'] = credit_df['Gutschrift CHF']
+                credit_df['Date'] = credit_df['Datum']
+                return credit_df
+            except pa.ArrowInvalid as e:
+                # e.g. amounts or dates in an unexpected format, the pandas path
+                # below coerces those values instead of failing
+                logger.warning("pyarrow could not parse CSV file, falling back to pandas parser: %s", e)
+                uploaded_file.seek(0)
+        
+        # Read CSV with semicolon separator
+        df = pd.read_csv(uploaded_file, sep=';', encoding='utf-8')
+        logger.info("CSV loaded with %d rows and columns: %s", len(df), list(df.columns))
+        
+        # Clean column names
+        df.columns = [col.strip().replace('"', '') for col in df.columns]
+        
+        # Empty or non-numeric amounts are dropped in the same pass
+        amounts = pd.to_numeric(df['Gutschrift CHF'], errors='coerce')
+        credit_df = df[amounts.notna()].copy()
+        credit_df['Amount'] = amounts[amounts.notna()]
+        
+        # Convert date
+        credit_df['Date'] = pd.to_datetime(credit_df['Datum'], format='%d.%m.%Y', errors='coerce')
+        return credit_df
     
     def parse_csv_file(self, uploaded_file) -> Optional[pd.DataFrame]:
         """Parse uploaded CSV file and extract relevant transactions"""
         logger.info("Parsing CSV file for bank statement import")
         try:
-            # Read CSV with semicolon separator
-            df = pd.read_csv(uploaded_file, sep=';', encoding='utf-8')
-            logger.info(f"CSV loaded with {len(df)} rows and columns: {list(df.columns)}")
-            
-            # Clean column names
-            df.columns = [col.strip().replace('"', '') for col in df.columns]
-            
-            # Filter for credit transactions (Gutschrift) only
-            credit_df = df[df['Gutschrift CHF'].notna() & (df['Gutschrift CHF'] != '')].copy()
-            logger.info(f"Found {len(credit_df)} credit transactions")
+            # Read credit transactions (Gutschrift) only
+            credit_df = self._read_credit_transactions(uploaded_file)
+            logger.info("Found %d credit transactions", len(credit_df))
             
             if credit_df.empty:
                 st.warning("Keine Gutschriften in der CSV-Datei gefunden.")
                 return None
             
-            # Convert amount to float
-            credit_df['Amount'] = pd.to_numeric(credit_df['Gutschrift CHF'], errors='coerce')
-            
-            # Convert date
-            credit_df['Date'] = pd.to_datetime(credit_df['Datum'], format='%d.%m.%Y', errors='coerce')
-            
             # Create processed dataframe with required columns
             processed_df = pd.DataFrame({
                 'Datum': credit_df['Date'],
-                'Details': credit_df['Details'].fillna(''),
+                'Details': _clean_text(credit_df['Details']),
                 'Amount': credit_df['Amount'],
                 'Zahlungszweck': 'Mitgliederbeitrag',  # Set default for ALL rows
                 'Mitglied': '',  # Will be filled by user
                 'Monat': '',  # Will be filled by user with smart defaults
-                'Bemerkungen': credit_df['Zahlungszweck'].fillna(''),  # Show Zahlungszweck info here
-                'ZKB-Referenz': credit_df['ZKB-Referenz'].fillna('')  # Include ZKB reference
+                'Bemerkungen': _clean_text(credit_df['Zahlungszweck']),  # Show Zahlungszweck info here
+                'ZKB-Referenz': _clean_text(credit_df['ZKB-Referenz'])  # Include ZKB reference
             })
             
             # Remove rows with invalid amounts
@@ -232,11 +348,16 @@ class CSVImportManager:
             # Auto-assign members based on Details field
             processed_df = self.auto_assign_members(processed_df)
             
-            logger.info(f"Processed {len(processed_df)} valid transactions")
+            # Store dropdown columns as categoricals with the dropdown options
+            processed_df['Zahlungszweck'] = self._to_category(processed_df['Zahlungszweck'], PAYMENT_PURPOSES)
+            processed_df['Mitglied'] = self._to_category(processed_df['Mitglied'], ("",) + self.get_member_names())
+            processed_df['Monat'] = self._to_category(processed_df['Monat'], MONTH_NAMES)
+            
+            logger.info("Processed %d valid transactions", len(processed_df))
             return processed_df
             
         except Exception as e:
-            logger.error(f"Error parsing CSV file: {str(e)}")
+            logger.error("Error parsing CSV file: %s", e)
             st.error(f"Fehler beim Verarbeiten der CSV-Datei: {str(e)}")
             return None
     
@@ -244,51 +365,13 @@ class CSVImportManager:
         """Create interactive table for CSV import with dropdowns"""
         logger.info("Creating interactive table for CSV import")
         
-        member_names = self.get_member_names()
-        payment_purposes = ["Mitgliederbeitrag", "Einführungskurs"]
-        month_options = ["", "Januar", "Februar", "März", "April", "Mai", "Juni", 
-                        "Juli", "August", "September", "Oktober", "November", "Dezember"]
-        
-        # Create column configuration
-        column_config = {
-            "Datum": st.column_config.DateColumn(
-                "Datum", 
-                format="DD.MM.YYYY",
-                disabled=True
-            ),
-            "Details": st.column_config.TextColumn(
-                "Details",
-                disabled=True
-            ),
-            "Amount": st.column_config.NumberColumn(
-                "Betrag (CHF)",
-                format="%.2f",
-                disabled=True
-            ),
-            "Zahlungszweck": st.column_config.SelectboxColumn(
-                "Zahlungszweck",
-                options=payment_purposes,
-                required=True
-            ),
-            "Mitglied": st.column_config.SelectboxColumn(
-                "Mitglied",
-                options=[""] + member_names,
-                required=True
-            ),
-            "Monat": st.column_config.SelectboxColumn(
-                "Monat",
-                options=month_options,
-                required=True
-            ),
-            "Bemerkungen": st.column_config.TextColumn(
-                "Bemerkungen",
-                disabled=True
-            ),
-            "ZKB-Referenz": st.column_config.TextColumn(
-                "ZKB-Referenz",
-                disabled=True
-            )
-        }
+        if df.empty:
+            st.info("Keine Transaktionen zum Anzeigen vorhanden.")
+            return df
+        
+        # Member names are cached until the database file changes, the column
+        # configuration per member list
+        column_config = _build_column_config(self.get_member_names())
         
         # Display the interactive table
         st.subheader("📊 Interaktive Tabelle - Kontoauszug Import")
@@ -310,27 +393,26 @@ class CSVImportManager:
         logger.info("Validating import data")
         
         # Check if all required fields are filled
-        missing_zweck = df['Zahlungszweck'].isna() | (df['Zahlungszweck'] == '')
-        missing_member = df['Mitglied'].isna() | (df['Mitglied'] == '')
-        missing_month = df['Monat'].isna() | (df['Monat'] == '')
-        
-        if missing_zweck.any():
-            missing_rows = df[missing_zweck].index.tolist()
-            return False, f"Bitte wählen Sie für alle Transaktionen einen Zahlungszweck aus. Fehlende Zeilen: {missing_rows}"
-        
-        if missing_member.any():
-            missing_rows = df[missing_member].index.tolist()
-            return False, f"Bitte wählen Sie für alle Transaktionen ein Mitglied aus. Fehlende Zeilen: {missing_rows}"
-        
-        if missing_month.any():
-            missing_rows = df[missing_month].index.tolist()
-            return False, f"Bitte wählen Sie für alle Transaktionen einen Monat aus. Fehlende Zeilen: {missing_rows}"
+        required = ['Zahlungszweck', 'Mitglied', 'Monat']
+        missing = df[required].isna() | df[required].eq('')
+        
+        if missing.to_numpy().any():
+            missing_messages = {
+                'Zahlungszweck': "Bitte wählen Sie für alle Transaktionen einen Zahlungszweck aus.",
+                'Mitglied': "Bitte wählen Sie für alle Transaktionen ein Mitglied aus.",
+                'Monat': "Bitte wählen Sie für alle Transaktionen einen Monat aus."
+            }
+            for column in required:
+                if missing[column].any():
+                    missing_rows = df.index[missing[column]].tolist()
+                    return False, f"{missing_messages[column]} Fehlende Zeilen: {missing_rows}"
         
         # Check for duplicate member assignments for the same month
-        duplicates = df.groupby(['Mitglied', 'Monat', 'Zahlungszweck']).size()
-        duplicates = duplicates[duplicates > 1]
+        duplicate_columns = ['Mitglied', 'Monat', 'Zahlungszweck']
+        duplicate_mask = df.duplicated(subset=duplicate_columns, keep=False)
         
-        if not duplicates.empty:
+        if duplicate_mask.any():
+            duplicates = df[duplicate_mask].groupby(duplicate_columns, observed=True).size()
             return False, f"Es wurden mehrere Transaktionen für dasselbe Mitglied im selben Monat gefunden: {duplicates.to_dict()}"
         
         # Check if entries already exist in the database
@@ -346,79 +428,88 @@ class CSVImportManager:
         logger.info("Transferring data to member database")
         
         try:
-            # Load current member database
+            # Load current member database (the cached dict is mutated below,
+            # so drop the cache afterwards whether or not the save succeeds)
             member_db = self.load_member_database()
             
-            # Group by member and process each transaction
-            for member_name, group in df.groupby('Mitglied'):
-                # Find member ID
-                member_id = None
-                for mid, member_data in member_db["members"].items():
-                    if member_data["name"] == member_name:
-                        member_id = mid
-                        break
+            # New member mappings are collected and written once at the end
+            mappings = self.load_member_mappings()
+            pending_mappings = {}
+            
+            # Lookups and values shared by all transactions
+            name_to_id = {}
+            for mid, member_data in member_db["members"].items():
+                name_to_id.setdefault(member_data["name"], mid)
+            import_timestamp = int(datetime.now().timestamp())
+            
+            columns = ['Mitglied', 'Monat', 'Datum', 'Amount', 'Zahlungszweck', 'Details', 'ZKB-Referenz']
+            rows = df.reindex(columns=columns, fill_value='')
+            
+            # Normalize text columns once instead of per row
+            for column in ['Mitglied', 'Monat', 'Zahlungszweck', 'Details', 'ZKB-Referenz']:
+                rows[column] = _clean_text(rows[column])
+            
+            # Process each transaction
+            for member_name, month_name, date, amount, purpose, details, zkb_reference in rows.itertuples(index=False, name=None):
+                member_id = name_to_id.get(member_name)
                 
                 if member_id is None:
-                    logger.warning(f"Member not found: {member_name}")
+                    logger.warning("Member not found: %s", member_name)
                     continue
                 
-                # Process each transaction for this member
-                for _, row in group.iterrows():
-                    # Use the selected month instead of date month
-                    month_name = str(row['Monat']).strip()
-                    year = str(row['Datum'].year)
-                    amount = float(row['Amount'])
-                    purpose = str(row['Zahlungszweck']).strip()
-                    
-                    # Convert month name to number
-                    month_to_num = {
-                        "Januar": "01", "Februar": "02", "März": "03", "April": "04",
-                        "Mai": "05", "Juni": "06", "Juli": "07", "August": "08",
-                        "September": "09", "Oktober": "10", "November": "11", "Dezember": "12"
-                    }
-                    month = month_to_num.get(month_name, row['Datum'].strftime('%m'))
-                    
-                    # Initialize contributions structure if not exists
-                    if "contributions" not in member_db["members"][member_id]:
-                        member_db["members"][member_id]["contributions"] = {}
-                    if year not in member_db["members"][member_id]["contributions"]:
-                        member_db["members"][member_id]["contributions"][year] = {}
-                    
-                    # Add contribution entry
-                    zkb_reference = str(row['ZKB-Referenz']).strip() if 'ZKB-Referenz' in row else ""
-                    transaction_id = zkb_reference if zkb_reference else f"CSV_{member_id}_{year}{month}_{int(datetime.now().timestamp())}"
-                    
-                    member_db["members"][member_id]["contributions"][year][month] = {
-                        "amount": amount,
-                        "date": row['Datum'].strftime('%Y-%m-%d'),
-                        "transaction_id": transaction_id,
-                        "source": "csv_import",
-                        "purpose": purpose,
-                        "details": str(row['Details']).strip(),
-                        "month_name": month_name,
-                        "zkb_reference": zkb_reference
-                    }
-                    
+                member = member_db["members"][member_id]
+                
+                # Use the selected month instead of date month
+                year = str(date.year)
+                amount = float(amount)
+                month = MONTH_TO_NUM.get(month_name)
+                if month is None:
+                    month = MONTH_STRINGS[date.month - 1]
+                
+                # Add contribution entry, creating the contributions structure if needed
+                transaction_id = zkb_reference if zkb_reference else f"CSV_{member_id}_{year}{month}_{import_timestamp}"
+                
+                member.setdefault("contributions", {}).setdefault(year, {})[month] = {
+                    "amount": amount,
+                    "date": date.strftime('%Y-%m-%d'),
+                    "transaction_id": transaction_id,
+                    "source": "csv_import",
+                    "purpose": purpose,
+                    "details": details,
+                    "month_name": month_name,
+                    "zkb_reference": zkb_reference
+                }
+                
                 # If it's an Einführungskurs payment, mark as completed
                 if purpose == "Einführungskurs":
-                    member_db["members"][member_id]["einfuehrungskurs"] = True
+                    member["einfuehrungskurs"] = True
                 
-                # Add member mapping for future auto-assignment
-                self.add_member_mapping(str(row['Details']).strip(), member_name.strip())
-                    
-                logger.info(f"Added {purpose} for {member_name} in {year}-{month}: {amount} CHF")
+                # Remember member mapping for future auto-assignment
+                if details and details not in mappings and details not in pending_mappings:
+                    pending_mappings[details] = member_name
+                
+                logger.debug("Added %s for %s in %s-%s: %s CHF", purpose, member_name, year, month, amount)
             
             # Save updated database
-            with open(self.member_db_file, "w", encoding="utf-8") as f:
-                json.dump(member_db, f, ensure_ascii=False, indent=2)
+            save_json(self.member_db_file, member_db, pretty=PRETTY_JSON)
+            
+            # Save new member mappings in a single write
+            if pending_mappings:
+                mappings.update(pending_mappings)
+                if self.save_member_mappings(mappings):
+                    logger.info("Successfully added %d member mappings", len(pending_mappings))
+                else:
+                    logger.error("Failed to save member mappings")
             
             logger.info("Successfully transferred data to member database")
             return True
             
         except Exception as e:
-            logger.error(f"Error transferring data to member database: {str(e)}")
+            logger.error("Error transferring data to member database: %s", e)
             st.error(f"Fehler beim Übertragen der Daten: {str(e)}")
             return False
+        finally:
+            self._member_db_cache = None
     
     def display_import_summary(self, df: pd.DataFrame):
         """Display summary of imported data"""
@@ -445,7 +536,7 @@ class CSVImportManager:
         
         # Show breakdown by member and month
         st.subheader("📊 Aufschlüsselung nach Mitgliedern und Monaten")
-        member_summary = df.groupby(['Mitglied', 'Monat', 'Zahlungszweck']).agg({
+        member_summary = df.groupby(['Mitglied', 'Monat', 'Zahlungszweck'], observed=True).agg({
             'Amount': ['sum', 'count']
         }).round(2)
         member_summary.columns = ['Betrag (CHF)', 'Anzahl']
@@ -468,7 +559,12 @@ class CSVImportManager:
         if uploaded_file is not None:
             # Parse CSV file
             with st.spinner("Verarbeite CSV-Datei..."):
-                self.imported_data = self.parse_csv_file(uploaded_file)
+                self.imported_data = self._parse_csv_bytes(
+                    uploaded_file.getvalue(),
+                    uploaded_file.name,
+                    _file_mtime_ns(self.member_db_file),
+                    _file_mtime_ns(self.categories_file)
+                )
             
             if self.imported_data is not None and not self.imported_data.empty:
                 # Display file info
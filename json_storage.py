@@ -0,0 +1,112 @@
+"""
+JSON Storage Module
+Reads and writes the JSON data files (member database, member mappings)
+"""
+import json
+import os
+import tempfile
+import threading
+from typing import Any, Dict
+
+# Try to import orjson for faster JSON encoding/decoding
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Machine-managed files (member database) are written compact, set
+# KLAB_PRETTY_JSON=1 to indent them as well (e.g. for debugging)
+PRETTY_JSON = os.getenv("KLAB_PRETTY_JSON", "").lower() in ("1", "true", "yes")
+
+# Encoders are created once and reused. The compact encoder runs on the C
+# accelerated path of the json module, which is not used with indent.
+_PRETTY_ENCODER = json.JSONEncoder(ensure_ascii=False, indent=2)
+_COMPACT_ENCODER = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+
+def load_json(path: str) -> Any:
+    """Load JSON data from a file"""
+    if ORJSON_AVAILABLE:
+        with open(path, "rb") as f:
+            return orjson.loads(f.read())
+
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def encode_json(data: Any, pretty: bool = True) -> bytes:
+    """
+    Encode data as UTF-8 JSON bytes
+
+    Args:
+        data: JSON serializable data
+        pretty: Indent the output with 2 spaces, otherwise encode compact JSON
+    """
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_NON_STR_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, option=option)
+
+    encoder = _PRETTY_ENCODER if pretty else _COMPACT_ENCODER
+    return encoder.encode(data).encode("utf-8")
+
+
+_path_locks: Dict[str, threading.Lock] = {}
+_path_locks_lock = threading.Lock()
+
+
+def _path_lock(path: str) -> threading.Lock:
+    """Lock that serializes all writes of one file"""
+    key = os.path.abspath(path)
+    with _path_locks_lock:
+        return _path_locks.setdefault(key, threading.Lock())
+
+
+def write_file_atomic(path: str, content: bytes) -> None:
+    """
+    Write bytes to a file
+
+    The content is written to a temporary file of its own and then moved
+    over the target, so a failed write never leaves a truncated file behind.
+    Writes of the same file from several threads are serialized.
+    """
+    with _path_lock(path):
+        # Write the encoded bytes with raw os.write calls and flush them to
+        # disk before the temporary file replaces the target
+        fd, tmp_path = tempfile.mkstemp(
+            dir=os.path.dirname(path) or ".", prefix=f"{os.path.basename(path)}.", suffix=".tmp"
+        )
+        try:
+            try:
+                if hasattr(os, "fchmod"):
+                    os.fchmod(fd, 0o644)
+                view = memoryview(content)
+                while view:
+                    view = view[os.write(fd, view):]
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+
+def save_json(path: str, data: Any, pretty: bool = True) -> None:
+    """
+    Save JSON data to a file
+
+    The data is encoded in one go and written atomically, see
+    write_file_atomic.
+
+    Args:
+        path: Target file path
+        data: JSON serializable data
+        pretty: Indent the output with 2 spaces, otherwise write compact JSON
+    """
+    write_file_atomic(path, encode_json(data, pretty))
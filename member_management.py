@@ -1,10 +1,13 @@
 import streamlit as st
 import pandas as pd
-import json
+import numpy as np
+import hashlib
 import os
+import uuid
 import logging
 from datetime import datetime
-from typing import Dict, Any, List
+from types import MappingProxyType
+from typing import Dict, Any, List, NamedTuple, Optional
 # Configure logging first
 logging.basicConfig(
     level=logging.INFO,
@@ -18,13 +21,17 @@ logger = logging.getLogger(__name__)
 
 # Try to import Telegram modules
 try:
-    from telegram_reminder import PaymentReminder
+    from telegram_reminder import TELEGRAM_AVAILABLE, PaymentReminder
     from telegram_config import is_telegram_configured
-    TELEGRAM_AVAILABLE = True
+    if not TELEGRAM_AVAILABLE:
+        logger.warning("Telegram modules not available: python-telegram-bot is not installed")
 except ImportError as e:
-    logger.warning(f"Telegram modules not available: {e}")
+    logger.warning("Telegram modules not available: %s", e)
     TELEGRAM_AVAILABLE = False
 
+# JSON file reading and writing (uses orjson when installed)
+from json_storage import PRETTY_JSON, encode_json, load_json, write_file_atomic
+
 # Always available CSV export
 from payment_reminder_export import PaymentReminderExport
 
@@ -82,8 +89,11 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Constants
+# Shared read-only default for nested .get() lookups
+_EMPTY = MappingProxyType({})
 MEMBER_DB_FILE = "k-lab_member_database.json"
 MITGLIEDSFORM_OPTIONS = ["Aktiv", "Passiv", "Inaktiv"]
+_MITGLIEDSFORM_INDEX = {form: i for i, form in enumerate(MITGLIEDSFORM_OPTIONS)}
 MONTHS = ["01", "02", "03", "04", "05", "06", "07", "08", "09", "10", "11", "12"]
 MONTH_NAMES = {
     "01": "Januar", "02": "Februar", "03": "März", "04": "April",
@@ -91,130 +101,267 @@ MONTH_NAMES = {
     "09": "September", "10": "Oktober", "11": "November", "12": "Dezember"
 }
 
+@st.cache_resource(show_spinner=False)
+def _member_column_config() -> Dict[str, Any]:
+    """
+    Column configuration of the member table
+    
+    The column descriptors never change, so they are built once and shared
+    by all reruns (the data editor copies them before use).
+    """
+    column_config = {
+        "Mitglied": st.column_config.TextColumn("Mitglied", disabled=True),
+        "Mitgliedsform": st.column_config.SelectboxColumn(
+            "Mitgliedsform",
+            options=MITGLIEDSFORM_OPTIONS
+        ),
+        "Einführungskurs": st.column_config.CheckboxColumn(
+            "Einführungskurs", 
+            help="Einführungskurs abgeschlossen",
+            width=80
+        )
+    }
+    
+    # Add month columns configuration
+    column_config.update({
+        MONTH_NAMES[month]: st.column_config.CheckboxColumn(
+            MONTH_NAMES[month],
+            help=f"Bezahlt für {MONTH_NAMES[month]} 2025",
+            width=60
+        )
+        for month in MONTHS
+    })
+    return column_config
+
+@st.cache_resource(show_spinner=False)
+def _payment_reminder() -> "PaymentReminder":
+    """
+    Telegram reminder sender shared by all reruns
+    
+    Keeps the bot's connection pool and event loop alive between sends.
+    """
+    return PaymentReminder()
+
 def load_member_database() -> Dict[str, Any]:
     """Load member database from JSON file"""
     logger.info("Loading member database from file")
     try:
         if os.path.exists(MEMBER_DB_FILE):
-            with open(MEMBER_DB_FILE, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                logger.info(f"Successfully loaded {len(data.get('members', {}))} members")
-                return data
+            data = load_json(MEMBER_DB_FILE)
+            logger.info("Successfully loaded %d members", len(data.get('members', {})))
+            return data
         else:
             logger.warning("Member database file not found, creating empty structure")
             return {"members": {}, "transactions_unknown": []}
     except Exception as e:
-        logger.error(f"Error loading member database: {str(e)}")
+        logger.error("Error loading member database: %s", e)
         st.error(f"Fehler beim Laden der Mitgliederdatenbank: {str(e)}")
         return {"members": {}, "transactions_unknown": []}
 
 def save_member_database(data: Dict[str, Any]) -> bool:
-    """Save member database to JSON file"""
+    """
+    Save member database to JSON file (skipped if nothing changed since the last save)
+    
+    Writes of all sessions are serialized, success and errors are reported
+    for this save.
+    """
     logger.info("Saving member database to file")
     try:
-        with open(MEMBER_DB_FILE, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        payload = encode_json(data, pretty=PRETTY_JSON)
+        payload_hash = hashlib.blake2b(payload, digest_size=16).digest()
+        
+        if payload_hash == st.session_state.get("member_db_saved_hash") and os.path.exists(MEMBER_DB_FILE):
+            logger.info("Member database unchanged since last save, skipping write")
+            return True
+        
+        write_file_atomic(MEMBER_DB_FILE, payload)
+        
+        st.session_state.member_db_saved_hash = payload_hash
+        bump_member_db_version()
+        mark_member_db_in_sync(_member_db_file_mtime())
         logger.info("Successfully saved member database")
         return True
     except Exception as e:
-        logger.error(f"Error saving member database: {str(e)}")
+        logger.error("Error saving member database: %s", e)
         st.error(f"Fehler beim Speichern der Mitgliederdatenbank: {str(e)}")
         return False
 
-def get_payment_status(member_id: str, month: str, year: str = "2025") -> bool:
-    """Check if member has paid for a specific month"""
-    if "members" not in st.session_state.member_db:
-        return False
+def bump_member_db_version() -> None:
+    """Mark the in-memory member database as changed, invalidates the cached member table"""
+    st.session_state.member_db_version = st.session_state.get("member_db_version", 0) + 1
+
+def _member_db_file_mtime() -> int:
+    """Modification time of the member database file in nanoseconds, 0 if it does not exist"""
+    try:
+        return os.stat(MEMBER_DB_FILE).st_mtime_ns
+    except OSError:
+        return 0
+
+def mark_member_db_in_sync(mtime: int) -> None:
+    """Remember that the in-memory member database matches the file with the given mtime"""
+    st.session_state.member_db_synced = (mtime, st.session_state.get("member_db_version", 0))
+
+def reload_member_database() -> None:
+    """Reload the member database into the session, skipped if neither the file nor the loaded data changed"""
+    mtime = _member_db_file_mtime()
+    if mtime and st.session_state.get("member_db_synced") == (mtime, st.session_state.get("member_db_version", 0)):
+        logger.info("Member database file unchanged, keeping loaded data")
+        return
     
-    member = st.session_state.member_db["members"].get(member_id, {})
-    contributions = member.get("contributions", {}).get(year, {})
-    return month in contributions
+    st.session_state.member_db = load_member_database()
+    st.session_state.member_db_next_num = None
+    bump_member_db_version()
+    mark_member_db_in_sync(mtime)
 
-def get_introduction_course_status(member_id: str) -> bool:
-    """Check if member has completed introduction course"""
-    if "members" not in st.session_state.member_db:
-        return False
+class MemberArrays(NamedTuple):
+    """Struct-of-arrays view of the members, one entry per member in database order"""
+    ids: np.ndarray      # member IDs
+    names: np.ndarray    # member names
+    forms: np.ndarray    # Mitgliedsform, "Aktiv" if not set
+    form_unset: np.ndarray  # record has no Mitgliedsform (bool)
+    intro: np.ndarray    # introduction course completed (bool)
+    paid: np.ndarray     # paid in 2025 (bool, one column per month in MONTHS order)
+
+def get_member_arrays() -> MemberArrays:
+    """Get the struct-of-arrays view of the session's members (cached per database version)"""
+    return _build_member_arrays(
+        st.session_state.get("member_db_session", ""),
+        st.session_state.get("member_db_version", 0),
+        st.session_state.member_db.get("members", {})
+    )
+
+@st.cache_resource(show_spinner=False, max_entries=50)
+def _build_member_arrays(session_id: str, version: int, _members: Dict[str, Any]) -> MemberArrays:
+    """Convert the member dicts to parallel arrays, cached per session and database version (the members dict is not hashed)"""
+    month_index = {month: i for i, month in enumerate(MONTHS)}
+    
+    count = len(_members)
+    ids = np.empty(count, dtype=object)
+    names = np.empty(count, dtype=object)
+    forms = np.empty(count, dtype=object)
+    form_unset = np.zeros(count, dtype=bool)
+    intro = np.zeros(count, dtype=bool)
+    paid = np.zeros((count, len(MONTHS)), dtype=bool)
+    
+    for i, (member_id, member_data) in enumerate(_members.items()):
+        ids[i] = member_id
+        names[i] = member_data["name"]
+        forms[i] = member_data.get("mitgliedsform", "Aktiv")
+        form_unset[i] = "mitgliedsform" not in member_data
+        intro[i] = bool(member_data.get("einfuehrungskurs", False))
+        
+        for month in member_data.get("contributions", _EMPTY).get("2025", _EMPTY):
+            col = month_index.get(month)
+            if col is not None:
+                paid[i, col] = True
     
-    member = st.session_state.member_db["members"].get(member_id, {})
-    return member.get("einfuehrungskurs", False)
+    return MemberArrays(ids, names, forms, form_unset, intro, paid)
 
 def create_member_dataframe() -> pd.DataFrame:
     """Create DataFrame for member management table"""
-    logger.info("Creating member dataframe for display")
-    
     if not st.session_state.member_db.get("members"):
         return pd.DataFrame()
     
-    data = []
-    for member_id, member_data in st.session_state.member_db["members"].items():
-        row = {
-            "Mitglied": member_data["name"],
-            "Mitgliedsform": member_data.get("mitgliedsform", "Aktiv"),
-            "Einführungskurs": get_introduction_course_status(member_id)
-        }
-        
-        # Add month columns
-        for month in MONTHS:
-            row[MONTH_NAMES[month]] = get_payment_status(member_id, month)
-        
-        data.append(row)
+    # The table is only rebuilt when the database version of this session
+    # changes, not on every rerun
+    return _build_member_dataframe(
+        st.session_state.get("member_db_session", ""),
+        st.session_state.get("member_db_version", 0),
+        get_member_arrays()
+    )
+
+@st.cache_data(show_spinner=False, max_entries=50)
+def _build_member_dataframe(session_id: str, version: int, _arrays: MemberArrays) -> pd.DataFrame:
+    """Build the member table, cached per session and database version (the arrays are not hashed)"""
+    logger.info("Creating member dataframe for display")
     
-    df = pd.DataFrame(data)
-    logger.info(f"Created dataframe with {len(df)} members and {len(df.columns)} columns")
+    df = pd.DataFrame({
+        "Mitglied": _arrays.names,
+        "Mitgliedsform": _arrays.forms,
+        "Einführungskurs": _arrays.intro,
+        **{MONTH_NAMES[month]: _arrays.paid[:, i] for i, month in enumerate(MONTHS)}
+    })
+    logger.info("Created dataframe with %d members and %d columns", len(df), len(df.columns))
     return df
 
-def update_member_from_dataframe(df: pd.DataFrame) -> bool:
-    """Update member database based on dataframe changes"""
+def update_member_from_dataframe(df: pd.DataFrame, original_df: Optional[pd.DataFrame] = None) -> bool:
+    """
+    Update member database based on dataframe changes
+    
+    If the table as it was displayed is passed as original_df, only rows
+    that differ from it are applied.
+    """
     logger.info("Updating member database from dataframe changes")
     
     try:
-        for idx, row in df.iterrows():
-            # Find member by name
-            member_id = None
-            for mid, member_data in st.session_state.member_db["members"].items():
-                if member_data["name"] == row["Mitglied"]:
-                    member_id = mid
-                    break
+        members = st.session_state.member_db["members"]
+        
+        # Iterate over plain tuples in a fixed column order instead of building
+        # a Series per row, the month columns follow in MONTHS order
+        columns = ["Mitglied", "Mitgliedsform", "Einführungskurs"] + [MONTH_NAMES[month] for month in MONTHS]
+        edited = df[columns]
+        arrays = get_member_arrays()
+        if original_df is not None:
+            # Added rows are missing in the original and always count as changed
+            original = original_df.reindex(index=edited.index, columns=columns)
+            changed = edited.ne(original).any(axis=1)
             
-            if member_id is None:
-                logger.warning(f"Member not found for name: {row['Mitglied']}")
+            # Members whose record lacks a field the table shows with its default
+            # (Mitgliedsform "Aktiv", no introduction course) are written back as well
+            defaults_unsaved = arrays.form_unset | np.fromiter(
+                ("einfuehrungskurs" not in members[member_id] for member_id in arrays.ids),
+                dtype=bool, count=arrays.ids.size
+            )
+            changed |= edited["Mitglied"].isin(arrays.names[defaults_unsaved])
+            edited = edited[changed]
+        
+        # Current payment status comes from the paid matrix of the member
+        # arrays, members are indexed by name once (the first member wins for
+        # duplicate names)
+        name_to_row = {}
+        for row, name in enumerate(arrays.names):
+            name_to_row.setdefault(name, row)
+        
+        # Collect the changes per member first: (member ID, form, course, added months, removed months)
+        changes = []
+        for name, mitgliedsform, einfuehrungskurs, *paid in edited.itertuples(index=False, name=None):
+            row = name_to_row.get(name)
+            if row is None:
+                logger.warning("Member not found for name: %s", name)
                 continue
             
-            # Update member form
-            st.session_state.member_db["members"][member_id]["mitgliedsform"] = row["Mitgliedsform"]
-            
-            # Update introduction course status
-            st.session_state.member_db["members"][member_id]["einfuehrungskurs"] = row["Einführungskurs"]
+            was_paid = arrays.paid[row].tolist()
+            added = [month for month, is_paid, had in zip(MONTHS, paid, was_paid) if is_paid and not had]
+            removed = [month for month, is_paid, had in zip(MONTHS, paid, was_paid) if had and not is_paid]
+            changes.append((arrays.ids[row], mitgliedsform, einfuehrungskurs, added, removed))
+        
+        # Apply the collected changes
+        for member_id, mitgliedsform, einfuehrungskurs, added, removed in changes:
+            member = members[member_id]
+            member["mitgliedsform"] = mitgliedsform
+            member["einfuehrungskurs"] = einfuehrungskurs
             
-            # Update monthly payment status
-            for month in MONTHS:
-                month_name = MONTH_NAMES[month]
-                is_paid = row[month_name]
+            if added:
+                contributions = member.setdefault("contributions", {}).setdefault("2025", {})
                 
-                if is_paid and not get_payment_status(member_id, month):
-                    # Add payment entry
-                    if "contributions" not in st.session_state.member_db["members"][member_id]:
-                        st.session_state.member_db["members"][member_id]["contributions"] = {}
-                    if "2025" not in st.session_state.member_db["members"][member_id]["contributions"]:
-                        st.session_state.member_db["members"][member_id]["contributions"]["2025"] = {}
-                    
-                    # Correct amount: 50.00 for Aktiv, 25.00 for Passiv
-                    amount = 50.00 if row["Mitgliedsform"] == "Aktiv" else 25.00
-                    
-                    st.session_state.member_db["members"][member_id]["contributions"]["2025"][month] = {
+                # Correct amount: 50.00 for Aktiv, 25.00 for Passiv
+                amount = 50.00 if mitgliedsform == "Aktiv" else 25.00
+                
+                for month in added:
+                    contributions[month] = {
                         "amount": amount,
                         "date": None,  # No default date for direct table entries
                         "transaction_id": None  # No default transaction_id for direct table entries
                     }
-                elif not is_paid and get_payment_status(member_id, month):
-                    # Remove payment entry
-                    if month in st.session_state.member_db["members"][member_id]["contributions"]["2025"]:
-                        del st.session_state.member_db["members"][member_id]["contributions"]["2025"][month]
+            
+            for month in removed:
+                member["contributions"]["2025"].pop(month, None)
         
-        logger.info("Successfully updated member database from dataframe")
+        bump_member_db_version()
+        logger.info("Successfully updated member database from dataframe (%d changed members)", len(changes))
         return True
     except Exception as e:
-        logger.error(f"Error updating member database: {str(e)}")
+        logger.error("Error updating member database: %s", e)
         return False
 
 def main():
@@ -224,7 +371,14 @@ def main():
     # Initialize session state
     if "member_db" not in st.session_state:
         logger.info("Initializing session state with member database")
+        mtime = _member_db_file_mtime()
         st.session_state.member_db = load_member_database()
+        st.session_state.member_db_next_num = None
+        # cache_data is shared between sessions, the session ID keeps the
+        # cached member tables of different sessions apart
+        st.session_state.member_db_session = uuid.uuid4().hex
+        st.session_state.member_db_version = 0
+        mark_member_db_in_sync(mtime)
     
     # Create tabs for different functionalities
     tab1, tab2 = st.tabs(["👥 Mitgliederverwaltung", "📥 CSV Import"])
@@ -237,17 +391,16 @@ def main():
 
 def add_new_member(name: str, phone: str, email: str, mitgliedsform: str) -> bool:
     """Add a new member to the database"""
-    logger.info(f"Adding new member: {name}")
+    logger.info("Adding new member: %s", name)
     
     try:
-        # Generate new member ID
-        existing_ids = list(st.session_state.member_db["members"].keys())
-        if existing_ids:
-            # Extract numeric part and find next ID
-            max_num = max([int(mid[1:]) for mid in existing_ids if mid.startswith('M') and mid[1:].isdigit()])
-            new_id = f"M{max_num + 1:03d}"
-        else:
-            new_id = "M001"
+        # Generate new member ID from the session counter, it is seeded from
+        # the highest existing ID after each (re)load
+        members = st.session_state.member_db["members"]
+        next_num = st.session_state.get("member_db_next_num")
+        if next_num is None or f"M{next_num:03d}" in members:
+            next_num = 1 + max((int(mid[1:]) for mid in members if mid.startswith('M') and mid[1:].isdigit()), default=0)
+        new_id = f"M{next_num:03d}"
         
         # Create new member entry with trimmed data
         new_member = {
@@ -262,17 +415,19 @@ def add_new_member(name: str, phone: str, email: str, mitgliedsform: str) -> boo
         
         # Add to database
         st.session_state.member_db["members"][new_id] = new_member
+        st.session_state.member_db_next_num = next_num + 1
+        bump_member_db_version()
         
         # Save to file
         if save_member_database(st.session_state.member_db):
-            logger.info(f"Successfully added member {name} with ID {new_id}")
+            logger.info("Successfully added member %s with ID %s", name, new_id)
             return True
         else:
             logger.error("Failed to save member database")
             return False
             
     except Exception as e:
-        logger.error(f"Error adding new member: {str(e)}")
+        logger.error("Error adding new member: %s", e)
         return False
 
 def run_member_management():
@@ -303,7 +458,7 @@ def run_member_management():
             new_mitgliedsform = st.selectbox(
                 "Mitgliedsform *",
                 options=MITGLIEDSFORM_OPTIONS,
-                index=MITGLIEDSFORM_OPTIONS.index(st.session_state.new_member_form),
+                index=_MITGLIEDSFORM_INDEX[st.session_state.new_member_form],
                 key="form_input"
             )
             
@@ -337,33 +492,10 @@ def run_member_management():
     st.subheader("Mitgliedertabelle")
     st.markdown("Bearbeiten Sie die Tabelle direkt. Änderungen werden beim Speichern in die Datenbank übernommen.")
     
-    # Create column configuration for data editor
-    column_config = {
-        "Mitglied": st.column_config.TextColumn("Mitglied", disabled=True),
-        "Mitgliedsform": st.column_config.SelectboxColumn(
-            "Mitgliedsform",
-            options=MITGLIEDSFORM_OPTIONS
-        ),
-        "Einführungskurs": st.column_config.CheckboxColumn(
-            "Einführungskurs", 
-            help="Einführungskurs abgeschlossen",
-            width=80
-        )
-    }
-    
-    # Add month columns configuration
-    for month in MONTHS:
-        month_name = MONTH_NAMES[month]
-        column_config[month_name] = st.column_config.CheckboxColumn(
-            month_name,
-            help=f"Bezahlt für {month_name} 2025",
-            width=60
-        )
-    
     # Display data editor
     edited_df = st.data_editor(
         member_df,
-        column_config=column_config,
+        column_config=_member_column_config(),
         hide_index=True,
         use_container_width=True,
         key="member_editor",
@@ -376,7 +508,7 @@ def run_member_management():
     with col1:
         if st.button("💾 Änderungen speichern", type="primary"):
             logger.info("User clicked save button")
-            if update_member_from_dataframe(edited_df):
+            if update_member_from_dataframe(edited_df, member_df):
                 if save_member_database(st.session_state.member_db):
                     st.success("✅ Änderungen erfolgreich gespeichert!")
                     st.rerun()
@@ -388,7 +520,7 @@ def run_member_management():
     with col2:
         if st.button("🔄 Neu laden"):
             logger.info("User clicked reload button")
-            st.session_state.member_db = load_member_database()
+            reload_member_database()
             st.rerun()
     
     with col3:
@@ -400,8 +532,7 @@ def run_member_management():
                 st.error("❌ Telegram Bot nicht konfiguriert. Bitte TELEGRAM_BOT_TOKEN setzen.")
             else:
                 with st.spinner("Sende Zahlungserinnerungen..."):
-                    reminder = PaymentReminder()
-                    results = reminder.send_reminders_sync(st.session_state.member_db)
+                    results = _payment_reminder().send_reminders_sync(st.session_state.member_db)
                     
                     if results:
                         success_count = sum(1 for success in results.values() if success)
@@ -459,80 +590,57 @@ def run_member_management():
     
     col1, col2, col3, col4 = st.columns(4)
     
+    # Count the member forms on the array view of the members
+    arrays = get_member_arrays()
+    forms = arrays.forms
+    
     with col1:
-        total_members = len(st.session_state.member_db["members"])
+        total_members = forms.size
         st.metric("Gesamtmitglieder", total_members)
     
     with col2:
-        active_members = sum(1 for member in st.session_state.member_db["members"].values() 
-                           if member.get("mitgliedsform") == "Aktiv")
-        st.metric("Aktive Mitglieder", active_members)
+        # Only an explicit Mitgliedsform counts, although the table shows unset ones as Aktiv
+        st.metric("Aktive Mitglieder", int(np.count_nonzero((forms == "Aktiv") & ~arrays.form_unset)))
     
     with col3:
-        passive_members = sum(1 for member in st.session_state.member_db["members"].values() 
-                            if member.get("mitgliedsform") == "Passiv")
-        st.metric("Passive Mitglieder", passive_members)
+        st.metric("Passive Mitglieder", int(np.count_nonzero(forms == "Passiv")))
     
     with col4:
-        inactive_members = sum(1 for member in st.session_state.member_db["members"].values() 
-                             if member.get("mitgliedsform") == "Inaktiv")
-        st.metric("Inaktive Mitglieder", inactive_members)
+        st.metric("Inaktive Mitglieder", int(np.count_nonzero(forms == "Inaktiv")))
     
     # Outstanding payments section
     st.subheader("💸 Ausstehende Zahlungen")
     
-    # Create outstanding payments dataframe
-    outstanding_data = []
-    for member_id, member_data in st.session_state.member_db["members"].items():
-        if member_data.get("mitgliedsform") == "Inaktiv":
-            continue
-            
-        # Calculate outstanding payments
-        member_form = member_data.get("mitgliedsform", "Aktiv")
-        monthly_amount = 50.0 if member_form == "Aktiv" else 25.0
-        
-        contributions = member_data.get("contributions", {}).get("2025", {})
-        paid_months = set(contributions.keys())
-        
-        current_month = datetime.now().month
-        outstanding_months = []
-        total_outstanding = 0.0
-        
-        for month in range(1, current_month + 1):
-            month_str = f"{month:02d}"
-            if month_str not in paid_months:
-                outstanding_months.append(MONTH_NAMES[month_str])
-                total_outstanding += monthly_amount
-        
-        if outstanding_months:
-            outstanding_data.append({
-                "Mitglied": member_data["name"],
-                "Mitgliedsform": member_form,
-                "Ausstehende Monate": ", ".join(outstanding_months),
-                "Betrag (CHF)": f"{total_outstanding:.2f}"
-            })
-    
-    if outstanding_data:
-        outstanding_df = pd.DataFrame(outstanding_data)
+    # Outstanding months as a (members x months) mask: due so far this year,
+    # not paid and the member is not inactive
+    due = np.arange(len(MONTHS)) < datetime.now().month
+    missing = due & ~arrays.paid & (forms != "Inaktiv")[:, None]
+    missing_count = missing.sum(axis=1)
+    rows = np.flatnonzero(missing_count)
+    
+    if rows.size:
+        month_names = np.array([MONTH_NAMES[month] for month in MONTHS], dtype=object)
+        amounts = np.where(forms[rows] == "Aktiv", 50.0, 25.0) * missing_count[rows]
+        outstanding_df = pd.DataFrame({
+            "Mitglied": arrays.names[rows],
+            "Mitgliedsform": forms[rows],
+            "Ausstehende Monate": [", ".join(month_names[missing[row]]) for row in rows],
+            "Betrag (CHF)": [f"{amount:.2f}" for amount in amounts]
+        })
         st.dataframe(outstanding_df, use_container_width=True, hide_index=True)
     else:
         st.success("🎉 Alle aktiven Mitglieder haben ihre Beiträge bezahlt!")
     
     # Payment overview
     st.subheader("📊 Zahlungsübersicht")
-    payment_data = []
-    for month in MONTHS:
-        month_name = MONTH_NAMES[month]
-        paid_count = sum(1 for member in st.session_state.member_db["members"].values()
-                        if get_payment_status(list(st.session_state.member_db["members"].keys())[
-                            list(st.session_state.member_db["members"].values()).index(member)], month))
-        payment_data.append({
-            "Monat": month_name,
-            "Bezahlt": paid_count,
-            "Nicht bezahlt": total_members - paid_count
-        })
     
-    payment_df = pd.DataFrame(payment_data)
+    # Count payments per month as column sums of the paid matrix
+    paid_per_month = arrays.paid.sum(axis=0)
+    payment_df = pd.DataFrame({
+        "Monat": [MONTH_NAMES[month] for month in MONTHS],
+        "Bezahlt": paid_per_month,
+        "Nicht bezahlt": total_members - paid_per_month
+    })
     st.dataframe(payment_df, use_container_width=True, hide_index=True)
 
 def run_csv_import():
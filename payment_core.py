@@ -0,0 +1,203 @@
+"""
+Payment Core Module
+Outstanding contribution calculation and reminder messages, shared by the
+CSV export and the Telegram reminders
+"""
+import functools
+import logging
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Mapping, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# German month names indexed by month number - 1
+MONTH_NAMES = (
+    "Januar", "Februar", "März", "April", "Mai", "Juni",
+    "Juli", "August", "September", "Oktober", "November", "Dezember"
+)
+
+# Month keys of the contributions ("01".."12") and their bit in a paid month mask
+MONTH_STRINGS = tuple(f"{month:02d}" for month in range(1, 13))
+_MONTH_BITS = {month_str: 1 << i for i, month_str in enumerate(MONTH_STRINGS)}
+
+# Lines of the reminder message, joined with the line separator of the caller
+_REMINDER_LINES = (
+    "💰 Zahlungserinnerung - K-Lab",
+    "",
+    "Hallo {name},",
+    "",
+    "Es fehlen noch Beiträge für folgende Monate:",
+    "{months}",
+    "",
+    "Mitgliedsform: {form}",
+    "Monatlicher Beitrag: {rate} CHF",
+    "Gesamtbetrag ausstehend: {total:.2f} CHF",
+    "",
+    "Bitte überweise den Betrag auf unser Konto.",
+    "",
+    "Vielen Dank!",
+    "K-Lab Team",
+)
+
+@functools.lru_cache(maxsize=64)
+def _reminder_formatter(member_form: str, sep: str) -> Callable[[Mapping[str, Any]], str]:
+    """
+    Reminder message formatter for a member form and line separator
+    
+    Form and monthly rate are filled into the template once, the returned
+    format_map only needs name, months and total.
+    """
+    rate = 50.0 if member_form == 'Aktiv' else 25.0
+    form = str(member_form).replace("{", "{{").replace("}", "}}")
+    template = sep.join(_REMINDER_LINES).replace("{form}", form).replace("{rate}", str(rate))
+    return template.format_map
+
+def paid_month_mask(contributions: Dict) -> int:
+    """Paid months of a year's contributions as bit mask (bit 0 = January)"""
+    paid_mask = 0
+    for month_str in contributions:
+        paid_mask |= _MONTH_BITS.get(month_str, 0)
+    return paid_mask
+
+@functools.lru_cache(maxsize=1024)
+def compute_outstanding(member_form: str, paid_mask: int, current_month: int) -> Tuple[Tuple[str, ...], float]:
+    """
+    Calculate outstanding months and total amount, cached per distinct input
+    
+    Args:
+        member_form: Member form (Aktiv/Passiv/Inaktiv)
+        paid_mask: Paid months of the current year as bit mask (bit 0 = January)
+        current_month: Months up to and including this one are due
+    
+    Returns:
+        Tuple of (outstanding_months, total_amount)
+    """
+    # Determine monthly contribution amount based on member form
+    if member_form == "Aktiv":
+        monthly_amount = 50.0  # CHF
+    elif member_form == "Passiv":
+        monthly_amount = 25.0  # CHF
+    else:  # Inaktiv
+        monthly_amount = 0.0
+    
+    if monthly_amount == 0.0:
+        return (), 0.0
+    
+    # Outstanding months (up to current month) are the due bits that are not paid
+    outstanding_mask = ((1 << current_month) - 1) & ~paid_mask
+    if not outstanding_mask:
+        return (), 0.0
+    total_outstanding = outstanding_mask.bit_count() * monthly_amount
+    
+    # Walk the set bits from the lowest (January) upwards
+    outstanding_months = []
+    while outstanding_mask:
+        lowest_bit = outstanding_mask & -outstanding_mask
+        outstanding_months.append(MONTH_STRINGS[lowest_bit.bit_length() - 1])
+        outstanding_mask ^= lowest_bit
+    
+    return tuple(outstanding_months), total_outstanding
+
+def calculate_outstanding_payments(member_data: Dict, current_month: Optional[int] = None,
+                                   current_year: Optional[str] = None) -> Tuple[List[str], float]:
+    """
+    Calculate outstanding payments for a member
+    
+    Args:
+        member_data: Member data from database
+        current_month: Months up to and including this one are due, defaults to the current month
+        current_year: Contribution year to check, defaults to 2025
+    
+    Returns:
+        Tuple of (outstanding_months, total_amount)
+    """
+    logger.info("Calculating outstanding payments for %s", member_data.get('name', 'Unknown'))
+    
+    # Get current year and month
+    if current_year is None:
+        current_year = "2025"
+    if current_month is None:
+        current_month = datetime.now().month
+    
+    # Get paid months as bit mask, the calculation itself is cached per distinct input
+    member_form = member_data.get("mitgliedsform", "Aktiv")
+    contributions = member_data.get("contributions", {}).get(current_year, {})
+    months, total_outstanding = compute_outstanding(member_form, paid_month_mask(contributions), current_month)
+    outstanding_months = list(months)
+    
+    logger.info("Outstanding months: %s, Total: %s CHF", outstanding_months, total_outstanding)
+    return outstanding_months, total_outstanding
+
+def format_reminder(member_name: str, member_form: str, outstanding_months: List[str], total_amount: float,
+                    current_year: Optional[int] = None, sep: str = "\n") -> str:
+    """
+    Format the payment reminder message
+    
+    Args:
+        member_name: Name of the member
+        member_form: Member form (Aktiv/Passiv/Inaktiv)
+        outstanding_months: List of outstanding months
+        total_amount: Total outstanding amount
+        current_year: Year named in the all paid message, defaults to the current year
+        sep: Line separator of the message
+    
+    Returns:
+        Formatted message string
+    """
+    if not outstanding_months:
+        if current_year is None:
+            current_year = datetime.now().year
+        return f"✅ Hallo {member_name},{sep}{sep}Alle Beiträge für {current_year} sind bereits bezahlt!"
+    
+    months_block = sep.join(f"• {MONTH_NAMES[int(month) - 1]}" for month in outstanding_months)
+    
+    return _reminder_formatter(member_form, sep)({
+        "name": member_name,
+        "months": months_block,
+        "total": total_amount
+    })
+
+class MemberView(NamedTuple):
+    """Fields of a member read by the reminder batch methods"""
+    name: str
+    form: str
+    telefon: str
+    email: str
+    paid_mask: int
+
+def to_view(member_data: Dict, default_name: str) -> MemberView:
+    """Read the fields of a member once, the 2025 contributions become a paid month mask"""
+    return MemberView(
+        name=member_data.get("name", default_name),
+        form=member_data.get("mitgliedsform", "Aktiv"),
+        telefon=member_data.get("telefon", ""),
+        email=member_data.get("email", ""),
+        paid_mask=paid_month_mask(member_data.get("contributions", {}).get("2025", {}))
+    )
+
+def to_views(members: Dict) -> List[MemberView]:
+    """Member views of all members of the database"""
+    return [to_view(member_data, f"Member {member_id}") for member_id, member_data in members.items()]
+
+def iter_due(views: List[MemberView], current_month: int) -> Iterator[Tuple[MemberView, List[str], float]]:
+    """
+    Yield (member, outstanding_months, total_amount) of every member that
+    is not inactive and has outstanding payments
+    """
+    due_mask = (1 << current_month) - 1
+    for view in views:
+        # Skip inactive members
+        if view.form == "Inaktiv":
+            logger.info("Skipping inactive member: %s", view.name)
+            continue
+        
+        # Members with all due months paid need no outstanding calculation
+        if due_mask & ~view.paid_mask:
+            months, total_amount = compute_outstanding(view.form, view.paid_mask, current_month)
+        else:
+            months, total_amount = (), 0.0
+        if not months:
+            logger.info("No outstanding payments for %s", view.name)
+            continue
+        
+        yield view, list(months), total_amount
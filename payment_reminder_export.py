@@ -2,64 +2,43 @@
 Payment Reminder Export Module
 Alternative to Telegram bot - exports payment reminders to CSV
 """
+import contextlib
+import io
 import logging
 import csv
-from typing import Dict, List, Tuple
+import numpy as np
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
+from payment_core import MONTH_NAMES, calculate_outstanding_payments, format_reminder, iter_due, to_views
 
 logger = logging.getLogger(__name__)
 
+# Export rows are written in batches of this size through a large file buffer,
+# so memory stays bounded for large member bases
+_CSV_BATCH_SIZE = 1000
+_CSV_BUFFER_SIZE = 1 << 20
+
 class PaymentReminderExport:
     """Handles payment reminder export to CSV"""
     
-    def calculate_outstanding_payments(self, member_data: Dict) -> Tuple[List[str], float]:
+    def calculate_outstanding_payments(self, member_data: Dict, current_month: Optional[int] = None,
+                                       current_year: Optional[str] = None) -> Tuple[List[str], float]:
         """
         Calculate outstanding payments for a member
         
         Args:
             member_data: Member data from database
+            current_month: Months up to and including this one are due, defaults to the current month
+            current_year: Contribution year to check, defaults to 2025
             
         Returns:
             Tuple of (outstanding_months, total_amount)
         """
-        logger.info(f"Calculating outstanding payments for {member_data.get('name', 'Unknown')}")
-        
-        # Determine monthly contribution amount based on member form
-        member_form = member_data.get("mitgliedsform", "Aktiv")
-        if member_form == "Aktiv":
-            monthly_amount = 50.0  # CHF
-        elif member_form == "Passiv":
-            monthly_amount = 25.0  # CHF
-        else:  # Inaktiv
-            monthly_amount = 0.0
-        
-        if monthly_amount == 0.0:
-            return [], 0.0
-        
-        # Get current year and month
-        current_year = "2025"
-        current_month = datetime.now().month
-        current_month_str = f"{current_month:02d}"
-        
-        # Get paid months
-        contributions = member_data.get("contributions", {}).get(current_year, {})
-        paid_months = set(contributions.keys())
-        
-        # Calculate outstanding months (up to current month)
-        outstanding_months = []
-        total_outstanding = 0.0
-        
-        for month in range(1, current_month + 1):
-            month_str = f"{month:02d}"
-            if month_str not in paid_months:
-                outstanding_months.append(month_str)
-                total_outstanding += monthly_amount
-        
-        logger.info(f"Outstanding months: {outstanding_months}, Total: {total_outstanding} CHF")
-        return outstanding_months, total_outstanding
+        return calculate_outstanding_payments(member_data, current_month, current_year)
     
     def format_reminder_message(self, member_name: str, member_form: str, 
-                              outstanding_months: List[str], total_amount: float) -> str:
+                              outstanding_months: List[str], total_amount: float,
+                              current_year: Optional[int] = None, sep: str = "\n") -> str:
         """
         Format the payment reminder message
         
@@ -68,35 +47,13 @@ class PaymentReminderExport:
             member_form: Member form (Aktiv/Passiv/Inaktiv)
             outstanding_months: List of outstanding months
             total_amount: Total outstanding amount
+            current_year: Year named in the all paid message, defaults to the current year
+            sep: Line separator of the message
             
         Returns:
             Formatted message string
         """
-        if not outstanding_months:
-            return f"✅ Hallo {member_name},\n\nAlle Beiträge für {datetime.now().year} sind bereits bezahlt!"
-        
-        month_names = {
-            "01": "Januar", "02": "Februar", "03": "März", "04": "April",
-            "05": "Mai", "06": "Juni", "07": "Juli", "08": "August",
-            "09": "September", "10": "Oktober", "11": "November", "12": "Dezember"
-        }
-        
-        outstanding_month_names = [month_names.get(month, month) for month in outstanding_months]
-        
-        message = f"💰 Zahlungserinnerung - K-Lab\n\n"
-        message += f"Hallo {member_name},\n\n"
-        message += f"Es fehlen noch Beiträge für folgende Monate:\n"
-        
-        for month_name in outstanding_month_names:
-            message += f"• {month_name}\n"
-        
-        message += f"\nMitgliedsform: {member_form}\n"
-        message += f"Monatlicher Beitrag: {50.0 if member_form == 'Aktiv' else 25.0} CHF\n"
-        message += f"Gesamtbetrag ausstehend: {total_amount:.2f} CHF\n\n"
-        message += f"Bitte überweise den Betrag auf unser Konto.\n\n"
-        message += f"Vielen Dank!\nK-Lab Team"
-        
-        return message
+        return format_reminder(member_name, member_form, outstanding_months, total_amount, current_year, sep)
     
     def export_reminders_to_csv(self, member_database: Dict, filename: str = "zahlungserinnerungen.csv") -> bool:
         """
@@ -112,7 +69,15 @@ class PaymentReminderExport:
         logger.info(f"Exporting payment reminders to {filename}")
         
         try:
-            with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
+            with contextlib.ExitStack() as stack:
+                # Text layer over an explicit buffered writer, closed in reverse
+                # order so the text and byte buffers are flushed before the file
+                raw_file = stack.enter_context(open(filename, 'wb', buffering=0))
+                buffered_file = stack.enter_context(io.BufferedWriter(raw_file, buffer_size=_CSV_BUFFER_SIZE))
+                csvfile = stack.enter_context(
+                    io.TextIOWrapper(buffered_file, encoding='utf-8', newline='', write_through=False)
+                )
+                
                 fieldnames = [
                     'Mitglied', 'Telefon', 'Email', 'Mitgliedsform', 
                     'Ausstehende_Monate', 'Monatlicher_Beitrag', 'Gesamtbetrag_CHF', 
@@ -121,55 +86,41 @@ class PaymentReminderExport:
                 writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
                 writer.writeheader()
                 
-                members = member_database.get("members", {})
+                views = to_views(member_database.get("members", {}))
                 exported_count = 0
+                current_month = datetime.now().month
+                rows = []
                 
-                for member_id, member_data in members.items():
-                    member_name = member_data.get("name", f"Member {member_id}")
-                    
-                    # Skip inactive members
-                    if member_data.get("mitgliedsform") == "Inaktiv":
-                        logger.info(f"Skipping inactive member: {member_name}")
-                        continue
-                    
-                    # Calculate outstanding payments
-                    outstanding_months, total_amount = self.calculate_outstanding_payments(member_data)
-                    
-                    # Skip if no outstanding payments
-                    if not outstanding_months:
-                        logger.info(f"No outstanding payments for {member_name}")
-                        continue
-                    
+                for view, outstanding_months, total_amount in iter_due(views, current_month):
                     # Format month names
-                    month_names = {
-                        "01": "Januar", "02": "Februar", "03": "März", "04": "April",
-                        "05": "Mai", "06": "Juni", "07": "Juli", "08": "August",
-                        "09": "September", "10": "Oktober", "11": "November", "12": "Dezember"
-                    }
-                    outstanding_month_names = [month_names.get(month, month) for month in outstanding_months]
+                    outstanding_month_names = [MONTH_NAMES[int(month) - 1] for month in outstanding_months]
                     
                     # Determine monthly amount
-                    member_form = member_data.get("mitgliedsform", "Aktiv")
-                    monthly_amount = 50.0 if member_form == "Aktiv" else 25.0
+                    monthly_amount = 50.0 if view.form == "Aktiv" else 25.0
                     
                     # Format reminder message
                     message = self.format_reminder_message(
-                        member_name, member_form, outstanding_months, total_amount
+                        view.name, view.form, outstanding_months, total_amount, sep=' | '
                     )
                     
-                    # Write row
-                    writer.writerow({
-                        'Mitglied': member_name,
-                        'Telefon': member_data.get("telefon", ""),
-                        'Email': member_data.get("email", ""),
-                        'Mitgliedsform': member_form,
+                    # Collect row
+                    rows.append({
+                        'Mitglied': view.name,
+                        'Telefon': view.telefon,
+                        'Email': view.email,
+                        'Mitgliedsform': view.form,
                         'Ausstehende_Monate': ", ".join(outstanding_month_names),
                         'Monatlicher_Beitrag': f"{monthly_amount:.2f} CHF",
                         'Gesamtbetrag_CHF': f"{total_amount:.2f}",
-                        'Nachricht': message.replace('\n', ' | ')
+                        'Nachricht': message
                     })
                     
                     exported_count += 1
+                    if len(rows) >= _CSV_BATCH_SIZE:
+                        writer.writerows(rows)
+                        rows.clear()
+                
+                writer.writerows(rows)
                 
                 logger.info(f"Successfully exported {exported_count} payment reminders to {filename}")
                 return True
@@ -188,24 +139,22 @@ class PaymentReminderExport:
         Returns:
             Dictionary with summary statistics
         """
-        members = member_database.get("members", {})
-        total_outstanding = 0.0
-        members_with_outstanding = 0
-        total_members = 0
+        members = [view for view in to_views(member_database.get("members", {})) if view.form != "Inaktiv"]
         
-        for member_id, member_data in members.items():
-            if member_data.get("mitgliedsform") == "Inaktiv":
-                continue
-                
-            total_members += 1
-            outstanding_months, total_amount = self.calculate_outstanding_payments(member_data)
-            
-            if outstanding_months:
-                members_with_outstanding += 1
-                total_outstanding += total_amount
+        # Form and paid month mask of the members are collected once, the
+        # outstanding months and amounts are then computed for all at once
+        forms = np.array([view.form for view in members], dtype=object)
+        paid_masks = np.fromiter((view.paid_mask for view in members), dtype=np.int64, count=len(members))
+        
+        month_bits = np.arange(12)
+        due = month_bits < datetime.now().month
+        paid = ((paid_masks[:, None] >> month_bits) & 1).astype(bool)
+        outstanding_counts = (due & ~paid).sum(axis=1)
+        monthly_amounts = np.select([forms == "Aktiv", forms == "Passiv"], [50.0, 25.0], 0.0)
+        amounts = outstanding_counts * monthly_amounts
         
         return {
-            "total_members": total_members,
-            "members_with_outstanding": members_with_outstanding,
-            "total_outstanding_amount": total_outstanding
+            "total_members": len(members),
+            "members_with_outstanding": int(np.count_nonzero(amounts)),
+            "total_outstanding_amount": float(amounts.sum())
         }
@@ -2,11 +2,14 @@
 Telegram Bot Configuration
 """
 import os
-from typing import Dict, Optional
+from typing import Dict, Iterable, List, Optional
 
 # Telegram Bot Configuration
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN", "")
 TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID", "")
+# Country code for national numbers (e.g. "+41"), "079 123 45 67" then
+# matches "+41791234567". National numbers are not rewritten without it.
+TELEGRAM_COUNTRY_CODE = os.getenv("TELEGRAM_COUNTRY_CODE", "")
 
 # Phone number to Telegram chat ID mapping
 # Add your member phone numbers and their corresponding Telegram chat IDs here
@@ -17,9 +20,36 @@ PHONE_TO_TELEGRAM_MAPPING: Dict[str, str] = {
     "+499998887776": "999888777",  # Tom Weber
 }
 
+# Separators are removed from phone numbers and the "00" international prefix
+# becomes "+" before lookup, so "+49 123 456-7890" and "0049 1234567890"
+# match the same entry
+_PHONE_TRANS = str.maketrans("", "", " -()/.")
+_COUNTRY_PREFIX = "+" + TELEGRAM_COUNTRY_CODE.translate(_PHONE_TRANS).lstrip("+0") if TELEGRAM_COUNTRY_CODE else ""
+
+def _normalize_phone(phone_number: str) -> str:
+    """Canonical form of a phone number for the chat ID lookup"""
+    phone = phone_number.translate(_PHONE_TRANS)
+    if phone.startswith("00"):
+        return "+" + phone[2:]
+    if phone.startswith("0") and _COUNTRY_PREFIX:
+        # Replace the national trunk prefix with the configured country code
+        return _COUNTRY_PREFIX + phone[1:]
+    return phone
+
+_NORMALIZED_MAPPING: Dict[str, str] = {
+    _normalize_phone(phone): chat_id for phone, chat_id in PHONE_TO_TELEGRAM_MAPPING.items()
+}
+
 def get_telegram_chat_id(phone_number: str) -> Optional[str]:
     """Get Telegram chat ID for a phone number"""
-    return PHONE_TO_TELEGRAM_MAPPING.get(phone_number)
+    if not phone_number:
+        return None
+    return _NORMALIZED_MAPPING.get(_normalize_phone(phone_number))
+
+def get_telegram_chat_ids(phone_numbers: Iterable[str]) -> List[Optional[str]]:
+    """Get Telegram chat IDs for many phone numbers at once (None where not mapped)"""
+    lookup = _NORMALIZED_MAPPING.get
+    return [lookup(_normalize_phone(phone)) if phone else None for phone in phone_numbers]
 
 def is_telegram_configured() -> bool:
     """Check if Telegram bot is properly configured"""
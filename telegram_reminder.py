@@ -5,67 +5,56 @@ import logging
 from typing import Dict, List, Tuple, Optional
 from datetime import datetime
 import asyncio
-from telegram import Bot
-from telegram.error import TelegramError
-from telegram_config import TELEGRAM_BOT_TOKEN, get_telegram_chat_id, is_telegram_configured
+import importlib.util
+import threading
+from telegram_config import TELEGRAM_BOT_TOKEN, get_telegram_chat_id, get_telegram_chat_ids, is_telegram_configured
+from payment_core import MemberView, calculate_outstanding_payments, format_reminder, iter_due, to_view, to_views
 
 logger = logging.getLogger(__name__)
 
+# python-telegram-bot is only imported once a PaymentReminder is created, so
+# importing this module (e.g. for the CSV path) does not load it
+TELEGRAM_AVAILABLE = importlib.util.find_spec("telegram") is not None
+
+# Upper bound for messages in flight at the same time (Telegram rate limits)
+MAX_CONCURRENT_SENDS = 10
+
+# Connections kept open to the Telegram API, enough for the concurrent sends
+_CONNECTION_POOL_SIZE = 20
+
 class PaymentReminder:
     """Handles payment reminders via Telegram"""
     
     def __init__(self):
-        self.bot_token = TELEGRAM_BOT_TOKEN
-        self.bot = Bot(token=self.bot_token) if self.bot_token else None
+        from telegram import Bot
+        from telegram.request import HTTPXRequest
         
-    def calculate_outstanding_payments(self, member_data: Dict) -> Tuple[List[str], float]:
+        self.bot_token = TELEGRAM_BOT_TOKEN
+        # The bot, its connection pool and the event loop live as long as this
+        # instance, so repeated sync sends reuse the open connections
+        self._request = HTTPXRequest(connection_pool_size=_CONNECTION_POOL_SIZE, http_version="1.1")
+        self.bot = Bot(token=self.bot_token, request=self._request) if self.bot_token else None
+        self._loop = asyncio.new_event_loop()
+        self._loop_lock = threading.Lock()
+        
+    def calculate_outstanding_payments(self, member_data: Dict, current_month: Optional[int] = None,
+                                       current_year: Optional[str] = None) -> Tuple[List[str], float]:
         """
         Calculate outstanding payments for a member
         
         Args:
             member_data: Member data from database
+            current_month: Months up to and including this one are due, defaults to the current month
+            current_year: Contribution year to check, defaults to 2025
             
         Returns:
             Tuple of (outstanding_months, total_amount)
         """
-        logger.info(f"Calculating outstanding payments for {member_data.get('name', 'Unknown')}")
-        
-        # Determine monthly contribution amount based on member form
-        member_form = member_data.get("mitgliedsform", "Aktiv")
-        if member_form == "Aktiv":
-            monthly_amount = 50.0  # CHF
-        elif member_form == "Passiv":
-            monthly_amount = 25.0  # CHF
-        else:  # Inaktiv
-            monthly_amount = 0.0
-        
-        if monthly_amount == 0.0:
-            return [], 0.0
-        
-        # Get current year and month
-        current_year = "2025"
-        current_month = datetime.now().month
-        current_month_str = f"{current_month:02d}"
-        
-        # Get paid months
-        contributions = member_data.get("contributions", {}).get(current_year, {})
-        paid_months = set(contributions.keys())
-        
-        # Calculate outstanding months (up to current month)
-        outstanding_months = []
-        total_outstanding = 0.0
-        
-        for month in range(1, current_month + 1):
-            month_str = f"{month:02d}"
-            if month_str not in paid_months:
-                outstanding_months.append(month_str)
-                total_outstanding += monthly_amount
-        
-        logger.info(f"Outstanding months: {outstanding_months}, Total: {total_outstanding} CHF")
-        return outstanding_months, total_outstanding
+        return calculate_outstanding_payments(member_data, current_month, current_year)
     
     def format_reminder_message(self, member_name: str, member_form: str, 
-                              outstanding_months: List[str], total_amount: float) -> str:
+                              outstanding_months: List[str], total_amount: float,
+                              current_year: Optional[int] = None, sep: str = "\n") -> str:
         """
         Format the payment reminder message
         
@@ -74,64 +63,53 @@ class PaymentReminder:
             member_form: Member form (Aktiv/Passiv/Inaktiv)
             outstanding_months: List of outstanding months
             total_amount: Total outstanding amount
+            current_year: Year named in the all paid message, defaults to the current year
+            sep: Line separator of the message
             
         Returns:
             Formatted message string
         """
-        if not outstanding_months:
-            return f"✅ Hallo {member_name},\n\nAlle Beiträge für {datetime.now().year} sind bereits bezahlt!"
-        
-        month_names = {
-            "01": "Januar", "02": "Februar", "03": "März", "04": "April",
-            "05": "Mai", "06": "Juni", "07": "Juli", "08": "August",
-            "09": "September", "10": "Oktober", "11": "November", "12": "Dezember"
-        }
-        
-        outstanding_month_names = [month_names.get(month, month) for month in outstanding_months]
-        
-        message = f"💰 Zahlungserinnerung - K-Lab\n\n"
-        message += f"Hallo {member_name},\n\n"
-        message += f"Es fehlen noch Beiträge für folgende Monate:\n"
-        
-        for month_name in outstanding_month_names:
-            message += f"• {month_name}\n"
-        
-        message += f"\nMitgliedsform: {member_form}\n"
-        message += f"Monatlicher Beitrag: {50.0 if member_form == 'Aktiv' else 25.0} CHF\n"
-        message += f"Gesamtbetrag ausstehend: {total_amount:.2f} CHF\n\n"
-        message += f"Bitte überweise den Betrag auf unser Konto.\n\n"
-        message += f"Vielen Dank!\nK-Lab Team"
-        
-        return message
+        return format_reminder(member_name, member_form, outstanding_months, total_amount, current_year, sep)
     
-    async def send_reminder_to_member(self, member_data: Dict) -> bool:
+    async def send_reminder_to_member(self, member_data: Dict,
+                                      outstanding: Optional[Tuple[List[str], float]] = None,
+                                      chat_id: Optional[str] = None) -> bool:
         """
         Send payment reminder to a specific member
         
         Args:
             member_data: Member data from database
+            outstanding: Already calculated (outstanding_months, total_amount), calculated if not given
+            chat_id: Already looked up Telegram chat ID, looked up by phone number if not given
             
         Returns:
             True if message sent successfully, False otherwise
         """
-        member_name = member_data.get("name", "Unbekannt")
-        phone_number = member_data.get("telefon", "")
-        
-        logger.info(f"Sending reminder to {member_name} ({phone_number})")
+        view = to_view(member_data, "Unbekannt")
         
         # Get Telegram chat ID
-        chat_id = get_telegram_chat_id(phone_number)
+        if chat_id is None:
+            chat_id = get_telegram_chat_id(view.telefon)
         if not chat_id:
-            logger.warning(f"No Telegram chat ID found for {member_name} ({phone_number})")
+            logger.warning(f"No Telegram chat ID found for {view.name} ({view.telefon})")
             return False
         
-        # Calculate outstanding payments
-        outstanding_months, total_amount = self.calculate_outstanding_payments(member_data)
+        if outstanding is None:
+            outstanding = self.calculate_outstanding_payments(member_data)
+        return await self._send_reminder(view, chat_id, outstanding)
+    
+    async def _send_reminder(self, view: MemberView, chat_id: str, outstanding: Tuple[List[str], float]) -> bool:
+        """Send the payment reminder with the given outstanding payments to a member's chat"""
+        logger.info(f"Sending reminder to {view.name} ({view.telefon})")
+        
+        from telegram.error import TelegramError
+        
+        outstanding_months, total_amount = outstanding
         
         # Format message
         message = self.format_reminder_message(
-            member_name, 
-            member_data.get("mitgliedsform", "Aktiv"),
+            view.name, 
+            view.form,
             outstanding_months, 
             total_amount
         )
@@ -139,13 +117,19 @@ class PaymentReminder:
         try:
             # Send message
             await self.bot.send_message(chat_id=chat_id, text=message)
-            logger.info(f"Successfully sent reminder to {member_name}")
+            logger.info(f"Successfully sent reminder to {view.name}")
             return True
             
         except TelegramError as e:
-            logger.error(f"Failed to send reminder to {member_name}: {str(e)}")
+            logger.error(f"Failed to send reminder to {view.name}: {str(e)}")
             return False
     
+    async def _send_reminder_limited(self, semaphore: asyncio.Semaphore, view: MemberView, chat_id: str,
+                                     outstanding: Tuple[List[str], float]) -> bool:
+        """Send a reminder once the semaphore allows another message in flight"""
+        async with semaphore:
+            return await self._send_reminder(view, chat_id, outstanding)
+    
     async def send_reminders_to_all_members(self, member_database: Dict) -> Dict[str, bool]:
         """
         Send payment reminders to all members with outstanding payments
@@ -166,26 +150,35 @@ class PaymentReminder:
         
         logger.info("Starting to send payment reminders to all members")
         
-        results = {}
-        members = member_database.get("members", {})
-        
-        for member_id, member_data in members.items():
-            member_name = member_data.get("name", f"Member {member_id}")
-            
-            # Skip inactive members
-            if member_data.get("mitgliedsform") == "Inaktiv":
-                logger.info(f"Skipping inactive member: {member_name}")
-                continue
-            
-            # Check if member has outstanding payments
-            outstanding_months, total_amount = self.calculate_outstanding_payments(member_data)
-            if not outstanding_months:
-                logger.info(f"No outstanding payments for {member_name}")
+        views = to_views(member_database.get("members", {}))
+        current_month = datetime.now().month
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_SENDS)
+        
+        # Look up the chat IDs of all members due a reminder in one go,
+        # members without a chat ID are reported as failed without a send
+        due = list(iter_due(views, current_month))
+        chat_ids = get_telegram_chat_ids([view.telefon for view, _, _ in due])
+        successes = [False] * len(due)
+        send_indices = []
+        sends = []
+        
+        for i, ((view, outstanding_months, total_amount), chat_id) in enumerate(zip(due, chat_ids)):
+            if not chat_id:
+                logger.warning(f"No Telegram chat ID found for {view.name} ({view.telefon})")
                 continue
-            
-            # Send reminder
-            success = await self.send_reminder_to_member(member_data)
-            results[member_name] = success
+            send_indices.append(i)
+            sends.append(self._send_reminder_limited(semaphore, view, chat_id, (outstanding_months, total_amount)))
+        
+        # Send all reminders concurrently, a failed send does not stop the others
+        for i, success in zip(send_indices, await asyncio.gather(*sends, return_exceptions=True)):
+            if isinstance(success, BaseException):
+                logger.error(f"Failed to send reminder to {due[i][0].name}: {str(success)}")
+                success = False
+            successes[i] = success
+        
+        results = {}
+        for (view, _, _), success in zip(due, successes):
+            results[view.name] = success
         
         logger.info(f"Completed sending reminders. Results: {results}")
         return results
@@ -201,7 +194,20 @@ class PaymentReminder:
             Dictionary with member names and success status
         """
         try:
-            return asyncio.run(self.send_reminders_to_all_members(member_database))
+            with self._loop_lock:
+                return self._loop.run_until_complete(self.send_reminders_to_all_members(member_database))
         except Exception as e:
             logger.error(f"Error in synchronous reminder sending: {str(e)}")
             return {}
+    
+    def close(self) -> None:
+        """Close the connection pool and the event loop"""
+        with self._loop_lock:
+            if self._loop.is_closed():
+                return
+            try:
+                self._loop.run_until_complete(self._request.shutdown())
+            except Exception as e:
+                logger.error(f"Error closing Telegram connections: {str(e)}")
+            finally:
+                self._loop.close()
@@ -3,10 +3,10 @@
 Test script for CSV import functionality
 """
 
-import pandas as pd
-import json
+import csv
 import os
 from csv_import_manager import CSVImportManager
+from json_storage import load_json
 
 def test_csv_parsing():
     """Test CSV parsing functionality"""
@@ -22,9 +22,9 @@ def test_csv_parsing():
         'ZKB-Referenz': ['SL250829579C9948', 'SL250829579BD487', 'SL250829579B1869']
     }
     
-    test_df = pd.DataFrame(test_data)
     test_csv_path = 'test_kontoauszug.csv'
-    test_df.to_csv(test_csv_path, sep=';', index=False)
+    with open(test_csv_path, 'w', newline='', encoding='utf-8') as f:
+        csv.writer(f, delimiter=';').writerows([list(test_data), *zip(*test_data.values())])
     
     print(f"✅ Created test CSV file: {test_csv_path}")
     
@@ -57,8 +57,7 @@ def test_member_database_structure():
     
     # Check if member database exists
     if os.path.exists('k-lab_member_database.json'):
-        with open('k-lab_member_database.json', 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = load_json('k-lab_member_database.json')
         
         members = data.get('members', {})
         print(f"✅ Member database found with {len(members)} members")